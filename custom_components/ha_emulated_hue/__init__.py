@@ -6,6 +6,9 @@ Home Assistant entities via the UI-managed device list.
 """
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 import logging
 
 from aiohttp import web
@@ -14,15 +17,24 @@ from homeassistant.components.http import KEY_HASS
 from homeassistant.components.network import async_get_source_ip
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import EVENT_HOMEASSISTANT_STARTED, EVENT_HOMEASSISTANT_STOP
-from homeassistant.core import Event, HomeAssistant, ServiceCall
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    CoreState,
+    Event,
+    HomeAssistant,
+    ServiceCall,
+)
 from homeassistant.helpers.typing import ConfigType
 
 from .const import (
+    CACHE_TIMEOUT,
+    CACHED_STATES_MAX_ENTRIES,
     CONF_ADVERTISE_IP,
     CONF_ADVERTISE_PORT,
     CONF_LISTEN_PORT,
     DEFAULT_LISTEN_PORT,
     DOMAIN,
+    HTTP_BACKLOG,
     SERVICE_RELOAD,
     SERVICE_TEST_CREATE_DEVICE,
     SERVICE_TEST_LIST_DEVICES,
@@ -41,12 +53,34 @@ from .hue_api import (
     HueOneLightStateView,
     HueUnauthorizedUser,
     HueUsernameView,
+    TTLCache,
 )
 from .hue_device_manager import HueDeviceManager
-from .upnp import DescriptionXmlView, async_create_upnp_datagram_endpoint
+from .upnp import (
+    DescriptionXmlView,
+    UPNPResponderProtocol,
+    async_create_upnp_datagram_endpoint,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+_SERVICES_REGISTERED = False
+_DEV_SERVICES: tuple[str, ...] = (
+    SERVICE_RELOAD,
+    SERVICE_TEST_CREATE_DEVICE,
+    SERVICE_TEST_LIST_DEVICES,
+)
+
+
+@dataclass
+class HaEmulatedHueData:
+    """Runtime data stored on the config entry."""
+
+    device_manager: HueDeviceManager
+    app: web.Application
+    cancel_start: CALLBACK_TYPE | None = None
+    stop_bridge: Callable[[], Awaitable[None]] | None = None
+
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Emulated Hue + component."""
@@ -67,38 +101,35 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     advertise_ip: str = entry.data.get(CONF_ADVERTISE_IP) or local_ip
     advertise_port: int = entry.data.get(CONF_ADVERTISE_PORT) or listen_port
 
-    # Store in hass data
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = {
-        "device_manager": device_manager,
-    }
-
     # Build the standalone aiohttp web application for the Hue API
     app = web.Application()
+    runtime_data = entry.runtime_data = HaEmulatedHueData(device_manager, app)
     app[KEY_HASS] = hass
     app[KEY_DEVICE_MANAGER] = device_manager
-    app[KEY_CACHED_STATES] = {}
+    app[KEY_CACHED_STATES] = TTLCache(
+        max_entries=CACHED_STATES_MAX_ENTRIES, ttl=CACHE_TIMEOUT
+    )
     app[KEY_ADVERTISE_IP] = advertise_ip
     app[KEY_ADVERTISE_PORT] = advertise_port
 
-    # Freeze on_startup so we can call startup() outside the normal flow
-    app._on_startup.freeze()  # noqa: SLF001
-    await app.startup()
-
     # Register all Hue API routes
-    DescriptionXmlView(advertise_ip, advertise_port).register(hass, app, app.router)
-    HueUsernameView().register(hass, app, app.router)
-    HueConfigView().register(hass, app, app.router)
-    HueUnauthorizedUser().register(hass, app, app.router)
-    HueAllLightsStateView().register(hass, app, app.router)
-    HueOneLightStateView().register(hass, app, app.router)
-    HueOneLightChangeView().register(hass, app, app.router)
-    HueAllGroupsStateView().register(hass, app, app.router)
-    HueGroupView().register(hass, app, app.router)
-    HueFullStateView().register(hass, app, app.router)
-
-    async def _start_bridge(event: Event) -> None:
+    for view in (
+        DescriptionXmlView(advertise_ip, advertise_port),
+        HueUsernameView(),
+        HueConfigView(),
+        HueUnauthorizedUser(),
+        HueAllLightsStateView(),
+        HueOneLightStateView(),
+        HueOneLightChangeView(),
+        HueAllGroupsStateView(),
+        HueGroupView(),
+        HueFullStateView(),
+    ):
+        view.register(hass, app, app.router)
+
+    async def _start_bridge(event: Event | None) -> None:
         """Start the HTTP server and SSDP responder after HA is fully started."""
+        runtime_data.cancel_start = None
         _LOGGER.info(
             "Starting Emulated Hue bridge on %s:%s (advertising %s:%s)",
             local_ip,
@@ -107,50 +138,77 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             advertise_port,
         )
 
-        # Start SSDP/UPnP responder
-        try:
-            protocol = await async_create_upnp_datagram_endpoint(
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, local_ip, listen_port, backlog=HTTP_BACKLOG)
+
+        # Start the SSDP/UPnP responder and the HTTP server concurrently
+        ssdp_result, http_result = await asyncio.gather(
+            async_create_upnp_datagram_endpoint(
                 local_ip,
                 True,  # upnp_bind_multicast
                 advertise_ip,
                 advertise_port,
-            )
-        except OSError as error:
-            _LOGGER.error("Failed to create SSDP responder: %s", error)
-            protocol = None
+            ),
+            site.start(),
+            return_exceptions=True,
+        )
 
-        # Start HTTP server
-        runner = web.AppRunner(app)
-        await runner.setup()
-        site = web.TCPSite(runner, local_ip, listen_port)
+        protocol: UPNPResponderProtocol | None = None
+        if isinstance(ssdp_result, OSError):
+            _LOGGER.error("Failed to create SSDP responder: %s", ssdp_result)
+        elif isinstance(ssdp_result, BaseException):
+            await runner.cleanup()
+            raise ssdp_result
+        else:
+            protocol = ssdp_result
 
-        try:
-            await site.start()
-        except OSError as error:
-            _LOGGER.error(
-                "Failed to start HTTP server on port %d: %s", listen_port, error
-            )
+        if isinstance(http_result, BaseException):
             if protocol:
                 protocol.close()
+            await runner.cleanup()
+            if not isinstance(http_result, OSError):
+                raise http_result
+            _LOGGER.error(
+                "Failed to start HTTP server on port %d: %s", listen_port, http_result
+            )
             return
 
         _LOGGER.info("Emulated Hue bridge is running")
 
-        async def _stop_bridge(event: Event) -> None:
+        stopped = False
+
+        async def _stop_bridge(event: Event | None = None) -> None:
             """Stop the HTTP server and SSDP responder."""
+            nonlocal stopped
+            if stopped:
+                return
+            stopped = True
+            if event is None:
+                # Called on unload rather than by the stop event
+                unsub_stop()
             _LOGGER.info("Stopping Emulated Hue bridge")
             if protocol:
                 protocol.close()
             await site.stop()
             await runner.cleanup()
 
-        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _stop_bridge)
+        unsub_stop = hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _stop_bridge)
+        runtime_data.stop_bridge = _stop_bridge
 
-    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, _start_bridge)
+    # On a reload HA is already running and the started event will not fire again
+    if hass.state is CoreState.running:
+        await _start_bridge(None)
+    else:
+        runtime_data.cancel_start = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STARTED, _start_bridge
+        )
 
     # Register development/testing services
-    if not hass.services.has_service(DOMAIN, SERVICE_RELOAD):
+    global _SERVICES_REGISTERED  # noqa: PLW0603
+    if not _SERVICES_REGISTERED:
         await _async_register_services(hass, device_manager)
+        _SERVICES_REGISTERED = True
 
     _LOGGER.info("Emulated Hue + setup complete")
     return True
@@ -160,20 +218,20 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.info("Unloading Emulated Hue + integration")
 
-    # Clean up device manager
-    if DOMAIN in hass.data and entry.entry_id in hass.data[DOMAIN]:
-        device_manager = hass.data[DOMAIN][entry.entry_id]["device_manager"]
-        await device_manager.async_cleanup()
-
-    # Remove from hass data
-    if DOMAIN in hass.data:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
-
-        # Remove services if this was the last entry
-        if not hass.data[DOMAIN]:
-            for service in (SERVICE_RELOAD, SERVICE_TEST_CREATE_DEVICE, SERVICE_TEST_LIST_DEVICES):
-                if hass.services.has_service(DOMAIN, service):
-                    hass.services.async_remove(DOMAIN, service)
+    # Stop the bridge and clean up device manager
+    runtime_data: HaEmulatedHueData = entry.runtime_data
+    if runtime_data.cancel_start:
+        runtime_data.cancel_start()
+    if runtime_data.stop_bridge:
+        await runtime_data.stop_bridge()
+    await runtime_data.device_manager.async_cleanup()
+
+    # Only a single entry is allowed, so its services go with it
+    global _SERVICES_REGISTERED  # noqa: PLW0603
+    if _SERVICES_REGISTERED:
+        for service in _DEV_SERVICES:
+            hass.services.async_remove(DOMAIN, service)
+        _SERVICES_REGISTERED = False
 
     return True
 
@@ -207,6 +265,10 @@ async def _async_register_services(
             ],
         )
 
-    hass.services.async_register(DOMAIN, SERVICE_RELOAD, reload_service)
-    hass.services.async_register(DOMAIN, SERVICE_TEST_CREATE_DEVICE, create_device_service)
-    hass.services.async_register(DOMAIN, SERVICE_TEST_LIST_DEVICES, list_devices_service)
+    handlers = {
+        SERVICE_RELOAD: reload_service,
+        SERVICE_TEST_CREATE_DEVICE: create_device_service,
+        SERVICE_TEST_LIST_DEVICES: list_devices_service,
+    }
+    for service in _DEV_SERVICES:
+        hass.services.async_register(DOMAIN, service, handlers[service])
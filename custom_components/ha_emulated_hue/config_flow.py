@@ -1,6 +1,6 @@
 """Config flow for Emulated Hue + integration."""
-import datetime
 import logging
+import time
 from typing import Any
 
 import voluptuous as vol
@@ -25,6 +25,11 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
+_PORT_SCHEMA = vol.All(vol.Coerce(int), vol.Range(min=1, max=65535))
+_ENTITY_SELECTOR = selector.EntitySelector(
+    selector.EntitySelectorConfig(domain=list(SUPPORTED_DOMAINS))
+)
+
 
 class HaEmulatedHueConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Emulated Hue +."""
@@ -55,11 +60,9 @@ class HaEmulatedHueConfigFlow(ConfigFlow, domain=DOMAIN):
             {
                 vol.Required(
                     CONF_LISTEN_PORT, default=DEFAULT_LISTEN_PORT
-                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=65535)),
+                ): _PORT_SCHEMA,
                 vol.Optional(CONF_ADVERTISE_IP): str,
-                vol.Optional(CONF_ADVERTISE_PORT): vol.All(
-                    vol.Coerce(int), vol.Range(min=1, max=65535)
-                ),
+                vol.Optional(CONF_ADVERTISE_PORT): _PORT_SCHEMA,
             }
         )
 
@@ -71,10 +74,7 @@ class HaEmulatedHueConfigFlow(ConfigFlow, domain=DOMAIN):
 
     def _check_existing_emulated_hue(self) -> bool:
         """Check if the built-in emulated_hue integration is active."""
-        for entry in self.hass.config_entries.async_entries():
-            if entry.domain == "emulated_hue":
-                return True
-        return False
+        return bool(self.hass.config_entries.async_entries("emulated_hue"))
 
     @staticmethod
     @callback
@@ -93,17 +93,17 @@ class HaEmulatedHueOptionsFlow(OptionsFlow):
     ) -> ConfigFlowResult:
         """Show the main options menu with device overview."""
         device_manager = self._get_device_manager()
-        devices = device_manager.get_all_devices()
+        devices = device_manager.get_all_devices_sorted()
 
         # Build device summary for the description
         # Note: description_placeholders are escaped as plain text by the
         # HA frontend, so markdown syntax must not be used here.
         if devices:
-            lines: list[str] = []
-            for device in sorted(devices, key=lambda d: int(d.hue_id)):
-                access = _format_last_access(device)
-                lines.append(f"[{device.hue_id}] {device.name} ({access})")
-            device_list = "\n".join(lines)
+            now = time.time()
+            device_list = "\n".join(
+                f"[{d.hue_id}] {d.name} ({_format_last_access(d, now)})"
+                for d in devices
+            )
         else:
             device_list = "No devices configured yet."
 
@@ -147,11 +147,7 @@ class HaEmulatedHueOptionsFlow(OptionsFlow):
         data_schema = vol.Schema(
             {
                 vol.Required("name"): str,
-                vol.Optional("entity_id"): selector.EntitySelector(
-                    selector.EntitySelectorConfig(
-                        domain=SUPPORTED_DOMAINS,
-                    )
-                ),
+                vol.Optional("entity_id"): _ENTITY_SELECTOR,
             }
         )
 
@@ -170,7 +166,7 @@ class HaEmulatedHueOptionsFlow(OptionsFlow):
     ) -> ConfigFlowResult:
         """Step 1: select which device to edit."""
         device_manager = self._get_device_manager()
-        devices = device_manager.get_all_devices()
+        devices = device_manager.get_all_devices_sorted()
 
         if not devices:
             return self.async_abort(reason="no_devices")
@@ -184,7 +180,7 @@ class HaEmulatedHueOptionsFlow(OptionsFlow):
                 "value": d.hue_id,
                 "label": f"{d.name} (ID {d.hue_id})",
             }
-            for d in sorted(devices, key=lambda d: int(d.hue_id))
+            for d in devices
         ]
 
         return self.async_show_form(
@@ -246,19 +242,9 @@ class HaEmulatedHueOptionsFlow(OptionsFlow):
         if device.entity_id:
             schema_dict[
                 vol.Optional("entity_id", default=device.entity_id)
-            ] = selector.EntitySelector(
-                selector.EntitySelectorConfig(
-                    domain=SUPPORTED_DOMAINS,
-                )
-            )
+            ] = _ENTITY_SELECTOR
         else:
-            schema_dict[
-                vol.Optional("entity_id")
-            ] = selector.EntitySelector(
-                selector.EntitySelectorConfig(
-                    domain=SUPPORTED_DOMAINS,
-                )
-            )
+            schema_dict[vol.Optional("entity_id")] = _ENTITY_SELECTOR
 
         return self.async_show_form(
             step_id="edit_device_details",
@@ -267,7 +253,7 @@ class HaEmulatedHueOptionsFlow(OptionsFlow):
             description_placeholders={
                 "hue_id": hue_id,
                 "device_name": device.name,
-                "last_access": _format_last_access(device),
+                "last_access": _format_last_access(device, time.time()),
             },
         )
 
@@ -280,7 +266,7 @@ class HaEmulatedHueOptionsFlow(OptionsFlow):
     ) -> ConfigFlowResult:
         """Delete (permanently retire) a device."""
         device_manager = self._get_device_manager()
-        devices = device_manager.get_all_devices()
+        devices = device_manager.get_all_devices_sorted()
 
         if not devices:
             return self.async_abort(reason="no_devices")
@@ -300,7 +286,7 @@ class HaEmulatedHueOptionsFlow(OptionsFlow):
                 "value": d.hue_id,
                 "label": f"{d.name} (ID {d.hue_id})",
             }
-            for d in sorted(devices, key=lambda d: int(d.hue_id))
+            for d in devices
         ]
 
         return self.async_show_form(
@@ -351,7 +337,7 @@ class HaEmulatedHueOptionsFlow(OptionsFlow):
             vol.Required(
                 CONF_LISTEN_PORT,
                 default=current_data.get(CONF_LISTEN_PORT, DEFAULT_LISTEN_PORT),
-            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=65535)),
+            ): _PORT_SCHEMA,
         }
 
         advertise_ip = current_data.get(CONF_ADVERTISE_IP)
@@ -364,11 +350,9 @@ class HaEmulatedHueOptionsFlow(OptionsFlow):
         if advertise_port:
             schema_dict[
                 vol.Optional(CONF_ADVERTISE_PORT, default=advertise_port)
-            ] = vol.All(vol.Coerce(int), vol.Range(min=1, max=65535))
+            ] = _PORT_SCHEMA
         else:
-            schema_dict[vol.Optional(CONF_ADVERTISE_PORT)] = vol.All(
-                vol.Coerce(int), vol.Range(min=1, max=65535)
-            )
+            schema_dict[vol.Optional(CONF_ADVERTISE_PORT)] = _PORT_SCHEMA
 
         return self.async_show_form(
             step_id="settings",
@@ -381,32 +365,30 @@ class HaEmulatedHueOptionsFlow(OptionsFlow):
 
     def _get_device_manager(self):
         """Get the device manager for this config entry."""
-        return self.hass.data[DOMAIN][self.config_entry.entry_id]["device_manager"]
+        return self.config_entry.runtime_data.device_manager
 
 
-def _format_last_access(device) -> str:
+def _format_last_access(device, now: float) -> str:
     """Format the last-access info for a device as a human-readable string."""
     if not device.last_accessed_at:
         return "never"
 
-    try:
-        accessed = datetime.datetime.fromisoformat(device.last_accessed_at)
-        delta = datetime.datetime.now() - accessed
-        total_seconds = int(delta.total_seconds())
-
-        if total_seconds < 60:
-            age = f"{total_seconds}s ago"
-        elif total_seconds < 3600:
-            age = f"{total_seconds // 60} min ago"
-        elif total_seconds < 86400:
-            hours = total_seconds // 3600
-            age = f"{hours}h ago"
-        else:
-            days = total_seconds // 86400
-            age = f"{days}d ago"
-
-        client = device.last_accessed_by or "unknown"
-        return f"{age} from {client}"
-
-    except (ValueError, TypeError):
+    accessed = device.last_accessed_ts
+    if accessed is None:
         return "unknown"
+
+    total_seconds = int(now - accessed)
+
+    if total_seconds < 60:
+        age = f"{total_seconds}s ago"
+    elif total_seconds < 3600:
+        age = f"{total_seconds // 60} min ago"
+    elif total_seconds < 86400:
+        hours = total_seconds // 3600
+        age = f"{hours}h ago"
+    else:
+        days = total_seconds // 86400
+        age = f"{days}d ago"
+
+    client = device.last_accessed_by or "unknown"
+    return f"{age} from {client}"
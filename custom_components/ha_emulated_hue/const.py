@@ -17,9 +17,14 @@ CONF_ADVERTISE_PORT = "advertise_port"
 # Default values
 DEFAULT_LISTEN_PORT = 80
 
+# Listen backlog for the Hue API server — Alexa polls every device at once
+HTTP_BACKLOG = 256
+
 # Storage keys
 STORAGE_KEY = f"{DOMAIN}_storage"
 STORAGE_VERSION = 1
+# Delay before writing changes, so bursts of edits coalesce into one save
+STORAGE_SAVE_DELAY = 0.5
 
 # Service names
 SERVICE_RELOAD = "reload"
@@ -27,7 +32,7 @@ SERVICE_TEST_CREATE_DEVICE = "test_create_device"
 SERVICE_TEST_LIST_DEVICES = "test_list_devices"
 
 # Device types supported
-SUPPORTED_DOMAINS = [
+SUPPORTED_DOMAINS = (
     "light",
     "switch",
     "fan",
@@ -37,7 +42,7 @@ SUPPORTED_DOMAINS = [
     "script",
     "scene",
     "input_boolean",
-]
+)
 
 # Hue API min/max values — https://developers.meethue.com/develop/hue-api/lights-api/
 HUE_API_STATE_BRI_MIN = 1
@@ -49,10 +54,23 @@ HUE_API_STATE_SAT_MAX = 254
 HUE_API_STATE_CT_MIN = 153
 HUE_API_STATE_CT_MAX = 500
 
+# Scale factors between Hue API ranges and HA units, so conversions
+# multiply rather than divide
+BRI_TO_PCT = 100 / HUE_API_STATE_BRI_MAX
+PCT_TO_BRI = HUE_API_STATE_BRI_MAX / 100
+BRI_TO_HASS = 255 / HUE_API_STATE_BRI_MAX
+HASS_TO_BRI = HUE_API_STATE_BRI_MAX / 255
+HUE_TO_DEG = 360 / HUE_API_STATE_HUE_MAX
+DEG_TO_HUE = HUE_API_STATE_HUE_MAX / 360
+SAT_TO_PCT = 100 / HUE_API_STATE_SAT_MAX
+PCT_TO_SAT = HUE_API_STATE_SAT_MAX / 100
+
 # How long a cached state entry is valid (seconds)
 CACHE_TIMEOUT = 2.0
+# Maximum number of cached states kept before the least recent is evicted
+CACHED_STATES_MAX_ENTRIES = 1024
 # How long to wait for a state change after a service call
 STATE_CHANGE_TIMEOUT = 5.0
 
 # Off-maps-to-on domains: "off" commands still trigger "on" for these
-OFF_MAPS_TO_ON_DOMAINS = {"script", "scene"}
+OFF_MAPS_TO_ON_DOMAINS = frozenset({"script", "scene"})
@@ -6,13 +6,13 @@ can discover and control devices managed by HueDeviceManager.
 from __future__ import annotations
 
 import asyncio
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
 from functools import lru_cache
-import hashlib
 from http import HTTPStatus
 from ipaddress import ip_address
 import logging
-import time
-from typing import Any
+from typing import Any, NamedTuple
 
 from aiohttp import web
 
@@ -45,7 +45,6 @@ from homeassistant.components.light import (
     ATTR_HS_COLOR,
     ATTR_TRANSITION,
     ATTR_XY_COLOR,
-    ColorMode,
     LightEntityFeature,
 )
 from homeassistant.components.media_player import (
@@ -69,13 +68,17 @@ from homeassistant.const import (
 )
 from homeassistant.core import Event, EventStateChangedData, State
 from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.json import json_bytes
 from homeassistant.util import color as color_util
 from homeassistant.util.json import json_loads
 from homeassistant.util.network import is_local
 
 from .const import (
-    CACHE_TIMEOUT,
+    BRI_TO_HASS,
+    BRI_TO_PCT,
+    DEG_TO_HUE,
     DOMAIN,
+    HASS_TO_BRI,
     HUE_API_STATE_BRI_MAX,
     HUE_API_STATE_BRI_MIN,
     HUE_API_STATE_CT_MAX,
@@ -86,7 +89,11 @@ from .const import (
     HUE_API_STATE_SAT_MIN,
     HUE_API_USERNAME,
     HUE_SERIAL_NUMBER,
+    HUE_TO_DEG,
     OFF_MAPS_TO_ON_DOMAINS,
+    PCT_TO_BRI,
+    PCT_TO_SAT,
+    SAT_TO_PCT,
     STATE_CHANGE_TIMEOUT,
 )
 from .hue_device import HueDevice
@@ -95,6 +102,7 @@ from .hue_device_manager import HueDeviceManager
 _LOGGER = logging.getLogger(__name__)
 
 _OFF_STATES: dict[str, str] = {cover.DOMAIN: STATE_CLOSED}
+_off_state_for_domain = _OFF_STATES.get
 
 # Hue API state key names (as they appear in JSON requests/responses)
 HUE_API_STATE_ON = "on"
@@ -107,6 +115,20 @@ HUE_API_STATE_XY = "xy"
 HUE_API_STATE_EFFECT = "effect"
 HUE_API_STATE_TRANSITION = "transitiontime"
 
+# Pre-encoded attribute names for the PUT success response
+_SUCCESS_ATTRS: dict[str, bytes] = {
+    attr: attr.encode()
+    for attr in (
+        HUE_API_STATE_ON,
+        HUE_API_STATE_BRI,
+        HUE_API_STATE_HUE,
+        HUE_API_STATE_SAT,
+        HUE_API_STATE_CT,
+        HUE_API_STATE_XY,
+        HUE_API_STATE_TRANSITION,
+    )
+}
+
 UNAUTHORIZED_USER = [
     {"error": {"address": "/", "description": "unauthorized user", "type": 1}}
 ]
@@ -134,11 +156,23 @@ DIMMABLE_SUPPORTED_FEATURES_BY_DOMAIN = {
     climate.DOMAIN: ClimateEntityFeature.TARGET_TEMPERATURE,
 }
 
-ENTITY_FEATURES_BY_DOMAIN = {
-    cover.DOMAIN: CoverEntityFeature,
-    fan.DOMAIN: FanEntityFeature,
-    media_player.DOMAIN: MediaPlayerEntityFeature,
-    climate.DOMAIN: ClimateEntityFeature,
+# Light capability bits, see _light_caps
+_CAP_BRIGHTNESS = 1
+_CAP_COLOR = 2
+_CAP_COLOR_TEMP = 4
+
+# Reported for devices that are unlinked or whose entity no longer exists
+_UNREACHABLE_TEMPLATE: dict[str, Any] = {
+    "state": {
+        HUE_API_STATE_ON: False,
+        "reachable": False,
+        "mode": "homeautomation",
+        HUE_API_STATE_BRI: 0,
+    },
+    "manufacturername": "Home Assistant",
+    "swversion": "123",
+    "type": "Dimmable light",
+    "modelid": "HASS123",
 }
 
 # Key used to store the device manager reference in the aiohttp app
@@ -148,15 +182,105 @@ KEY_ADVERTISE_IP = "ha_emulated_hue_advertise_ip"
 KEY_ADVERTISE_PORT = "ha_emulated_hue_advertise_port"
 
 
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after a fixed time-to-live.
+
+    Times are event loop seconds supplied by the caller so a single clock
+    read can be shared across lookups.
+    """
+
+    __slots__ = ("_data", "_max_entries", "_ttl")
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        """Initialize the cache."""
+        self._data: OrderedDict[str, tuple[float | None, Any]] = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl = ttl
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if the key has an entry, expired or not."""
+        return key in self._data
+
+    def __len__(self) -> int:
+        """Return the number of entries, expired or not."""
+        return len(self._data)
+
+    def get(self, key: str, now: float) -> Any | None:
+        """Return the value for key, or None if missing or expired."""
+        if (entry := self._data.get(key)) is None:
+            return None
+        expiry, value = entry
+        if expiry is not None and now >= expiry:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, now: float, permanent: bool = False) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        data = self._data
+        data[key] = (None if permanent else now + self._ttl, value)
+        data.move_to_end(key)
+        if len(data) > self._max_entries:
+            data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        """Remove the entry for key if present."""
+        self._data.pop(key, None)
+
+
+def _json_response(
+    payload: Any, status_code: HTTPStatus | int = HTTPStatus.OK
+) -> web.Response:
+    """Serialize a Hue API payload with orjson into a plain JSON response.
+
+    Unlike HomeAssistantView.json this does not enable compression. Hue
+    clients are on the local network, where the smaller body saves nothing
+    noticeable, while compressing costs CPU on every poll.
+    """
+    return _json_body_response(json_bytes(payload), status_code)
+
+
+def _json_body_response(
+    body: bytes, status_code: HTTPStatus | int = HTTPStatus.OK
+) -> web.Response:
+    """Return an already-encoded JSON body as a response."""
+    return web.Response(
+        body=body, content_type="application/json", status=int(status_code)
+    )
+
+
+def _json_message(
+    message: str, status_code: HTTPStatus | int = HTTPStatus.OK
+) -> web.Response:
+    """Return a {"message": ...} JSON response, like HomeAssistantView."""
+    return _json_response({"message": message}, status_code)
+
+
 # ---------------------------------------------------------------------------
 # Security
 # ---------------------------------------------------------------------------
 
 
-@lru_cache(maxsize=32)
+# Prefixes that are always local, checked before parsing the address
+_LOCAL_PREFIXES = ("192.168.", "10.", "127.")
+# Cardinality is bounded by the clients on the LAN, so this rarely fills
+_REMOTE_CACHE_MAX = 256
+_remote_allowed_cache: dict[str, bool] = {}
+
+
 def _remote_is_allowed(address: str) -> bool:
     """Only allow requests from the local network."""
-    return is_local(ip_address(address))
+    if (allowed := _remote_allowed_cache.get(address)) is not None:
+        return allowed
+    if address.startswith(_LOCAL_PREFIXES) or address == "::1":
+        allowed = True
+    else:
+        allowed = is_local(ip_address(address))
+    if len(_remote_allowed_cache) >= _REMOTE_CACHE_MAX:
+        _remote_allowed_cache.clear()
+    _remote_allowed_cache[address] = allowed
+    return allowed
 
 
 # ---------------------------------------------------------------------------
@@ -176,17 +300,17 @@ class HueUsernameView(HomeAssistantView):
         """Handle a POST request."""
         assert request.remote is not None
         if not _remote_is_allowed(request.remote):
-            return self.json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
+            return _json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
 
         try:
             data = await request.json(loads=json_loads)
         except ValueError:
-            return self.json_message("Invalid JSON", HTTPStatus.BAD_REQUEST)
+            return _json_message("Invalid JSON", HTTPStatus.BAD_REQUEST)
 
         if "devicetype" not in data:
-            return self.json_message("devicetype not specified", HTTPStatus.BAD_REQUEST)
+            return _json_message("devicetype not specified", HTTPStatus.BAD_REQUEST)
 
-        return self.json([{"success": {"username": HUE_API_USERNAME}}])
+        return _json_response([{"success": {"username": HUE_API_USERNAME}}])
 
 
 class HueUnauthorizedUser(HomeAssistantView):
@@ -199,7 +323,7 @@ class HueUnauthorizedUser(HomeAssistantView):
 
     async def get(self, request: web.Request) -> web.Response:
         """Handle a GET request."""
-        return self.json(UNAUTHORIZED_USER)
+        return _json_response(UNAUTHORIZED_USER)
 
 
 class HueConfigView(HomeAssistantView):
@@ -215,9 +339,9 @@ class HueConfigView(HomeAssistantView):
         """Handle a GET request."""
         assert request.remote is not None
         if not _remote_is_allowed(request.remote):
-            return self.json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
+            return _json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
 
-        return self.json(_create_config_model(request))
+        return _json_body_response(_create_config_body(request))
 
 
 class HueAllLightsStateView(HomeAssistantView):
@@ -232,9 +356,9 @@ class HueAllLightsStateView(HomeAssistantView):
         """Handle a GET request."""
         assert request.remote is not None
         if not _remote_is_allowed(request.remote):
-            return self.json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
+            return _json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
 
-        return self.json(_create_list_of_entities(request))
+        return _json_body_response(_create_list_of_entities(request))
 
 
 class HueOneLightStateView(HomeAssistantView):
@@ -249,7 +373,7 @@ class HueOneLightStateView(HomeAssistantView):
         """Handle a GET request."""
         assert request.remote is not None
         if not _remote_is_allowed(request.remote):
-            return self.json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
+            return _json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
 
         hass = request.app[KEY_HASS]
         device_manager: HueDeviceManager = request.app[KEY_DEVICE_MANAGER]
@@ -257,7 +381,7 @@ class HueOneLightStateView(HomeAssistantView):
         device = device_manager.get_device(entity_id)
         if device is None:
             _LOGGER.debug("Unknown device number: %s", entity_id)
-            return self.json(
+            return _json_response(
                 _hue_api_error(
                     3,
                     f"/lights/{entity_id}",
@@ -268,8 +392,10 @@ class HueOneLightStateView(HomeAssistantView):
 
         device.record_access(request.remote)
 
-        return self.json(
-            device_to_json(hass, device, request.app[KEY_CACHED_STATES])
+        return _json_body_response(
+            device_to_json_bytes(
+                hass, device, request.app[KEY_CACHED_STATES], hass.loop.time()
+            )
         )
 
 
@@ -285,16 +411,17 @@ class HueFullStateView(HomeAssistantView):
         """Handle a GET request."""
         assert request.remote is not None
         if not _remote_is_allowed(request.remote):
-            return self.json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
+            return _json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
 
         if username != HUE_API_USERNAME:
-            return self.json(UNAUTHORIZED_USER)
+            return _json_response(UNAUTHORIZED_USER)
 
-        return self.json(
-            {
-                "lights": _create_list_of_entities(request),
-                "config": _create_config_model(request),
-            }
+        return _json_body_response(
+            b'{"lights":%b,"config":%b}'
+            % (
+                _create_list_of_entities(request),
+                _create_config_body(request),
+            )
         )
 
 
@@ -310,9 +437,9 @@ class HueAllGroupsStateView(HomeAssistantView):
         """Handle a GET request."""
         assert request.remote is not None
         if not _remote_is_allowed(request.remote):
-            return self.json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
+            return _json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
 
-        return self.json({})
+        return _json_response({})
 
 
 class HueGroupView(HomeAssistantView):
@@ -327,9 +454,9 @@ class HueGroupView(HomeAssistantView):
         """Handle a PUT request."""
         assert request.remote is not None
         if not _remote_is_allowed(request.remote):
-            return self.json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
+            return _json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
 
-        return self.json(
+        return _json_response(
             [
                 {
                     "error": {
@@ -355,16 +482,16 @@ class HueOneLightChangeView(HomeAssistantView):
         """Process a request to set the state of an individual light."""
         assert request.remote is not None
         if not _remote_is_allowed(request.remote):
-            return self.json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
+            return _json_message("Only local IPs allowed", HTTPStatus.UNAUTHORIZED)
 
         hass: core.HomeAssistant = request.app[KEY_HASS]
         device_manager: HueDeviceManager = request.app[KEY_DEVICE_MANAGER]
-        cached_states: dict[str, list] = request.app[KEY_CACHED_STATES]
+        cached_states: TTLCache = request.app[KEY_CACHED_STATES]
 
         device = device_manager.get_device(entity_number)
         if device is None:
             _LOGGER.debug("Unknown device number: %s", entity_number)
-            return self.json(
+            return _json_response(
                 _hue_api_error(
                     3,
                     f"/lights/{entity_number}",
@@ -377,7 +504,7 @@ class HueOneLightChangeView(HomeAssistantView):
 
         if not device.entity_id:
             _LOGGER.warning("Device %s is not linked to an entity", entity_number)
-            return self.json(
+            return _json_response(
                 _hue_api_error(
                     3,
                     f"/lights/{entity_number}",
@@ -390,7 +517,7 @@ class HueOneLightChangeView(HomeAssistantView):
         entity = hass.states.get(entity_id)
         if entity is None:
             _LOGGER.warning("Entity not found: %s", entity_id)
-            return self.json(
+            return _json_response(
                 _hue_api_error(
                     3,
                     f"/lights/{entity_number}",
@@ -400,72 +527,52 @@ class HueOneLightChangeView(HomeAssistantView):
             )
 
         try:
-            request_json = await request.json()
+            request_json = await request.json(loads=json_loads)
         except ValueError:
             _LOGGER.error("Received invalid json")
-            return self.json_message("Invalid JSON", HTTPStatus.BAD_REQUEST)
+            return _json_message("Invalid JSON", HTTPStatus.BAD_REQUEST)
 
         # Get entity capabilities
+        current_on = _hass_to_hue_state(entity)
         entity_features = entity.attributes.get(ATTR_SUPPORTED_FEATURES, 0)
-        if entity.domain == light.DOMAIN:
-            color_modes = (
-                entity.attributes.get(light.ATTR_SUPPORTED_COLOR_MODES) or []
-            )
+        caps = _light_caps(entity)
 
         # Parse the incoming Hue API request
-        parsed: dict[str, Any] = {
-            HUE_API_STATE_ON: False,
-            HUE_API_STATE_BRI: None,
-            HUE_API_STATE_HUE: None,
-            HUE_API_STATE_SAT: None,
-            HUE_API_STATE_CT: None,
-            HUE_API_STATE_XY: None,
-            HUE_API_STATE_TRANSITION: None,
-        }
-
         if HUE_API_STATE_ON in request_json:
-            if not isinstance(request_json[HUE_API_STATE_ON], bool):
+            on_state = request_json[HUE_API_STATE_ON]
+            if not isinstance(on_state, bool):
                 _LOGGER.error("Unable to parse data: %s", request_json)
-                return self.json_message("Bad request", HTTPStatus.BAD_REQUEST)
-            parsed[HUE_API_STATE_ON] = request_json[HUE_API_STATE_ON]
+                return _json_message("Bad request", HTTPStatus.BAD_REQUEST)
         else:
-            parsed[HUE_API_STATE_ON] = _hass_to_hue_state(entity)
-
-        for key in (
-            HUE_API_STATE_BRI,
-            HUE_API_STATE_HUE,
-            HUE_API_STATE_SAT,
-            HUE_API_STATE_CT,
-            HUE_API_STATE_TRANSITION,
-        ):
-            if key in request_json:
-                try:
-                    parsed[key] = int(request_json[key])
-                except ValueError:
-                    _LOGGER.error("Unable to parse data: %s", request_json)
-                    return self.json_message("Bad request", HTTPStatus.BAD_REQUEST)
-
-        if HUE_API_STATE_XY in request_json:
-            try:
-                parsed[HUE_API_STATE_XY] = (
+            on_state = current_on
+
+        try:
+            bri = _parse_int_field(request_json, HUE_API_STATE_BRI)
+            hue = _parse_int_field(request_json, HUE_API_STATE_HUE)
+            sat = _parse_int_field(request_json, HUE_API_STATE_SAT)
+            ct = _parse_int_field(request_json, HUE_API_STATE_CT)
+            transition = _parse_int_field(request_json, HUE_API_STATE_TRANSITION)
+            xy: tuple[float, float] | None = None
+            if HUE_API_STATE_XY in request_json:
+                xy = (
                     float(request_json[HUE_API_STATE_XY][0]),
                     float(request_json[HUE_API_STATE_XY][1]),
                 )
-            except ValueError:
-                _LOGGER.error("Unable to parse data: %s", request_json)
-                return self.json_message("Bad request", HTTPStatus.BAD_REQUEST)
+        except ValueError:
+            _LOGGER.error("Unable to parse data: %s", request_json)
+            return _json_message("Bad request", HTTPStatus.BAD_REQUEST)
 
         # Domain-specific brightness interpretation
-        if HUE_API_STATE_BRI in request_json:
+        if bri is not None:
             if entity.domain == light.DOMAIN:
-                if light.brightness_supported(color_modes):
-                    parsed[HUE_API_STATE_ON] = parsed[HUE_API_STATE_BRI] > 0
+                if caps & _CAP_BRIGHTNESS:
+                    on_state = bri > 0
                 else:
-                    parsed[HUE_API_STATE_BRI] = None
+                    bri = None
 
             elif entity.domain == scene.DOMAIN:
-                parsed[HUE_API_STATE_BRI] = None
-                parsed[HUE_API_STATE_ON] = True
+                bri = None
+                on_state = True
 
             elif entity.domain in (
                 script.DOMAIN,
@@ -476,117 +583,22 @@ class HueOneLightChangeView(HomeAssistantView):
                 humidifier.DOMAIN,
             ):
                 # Convert 0-254 to 0-100
-                level = (parsed[HUE_API_STATE_BRI] / HUE_API_STATE_BRI_MAX) * 100
-                parsed[HUE_API_STATE_BRI] = round(level)
-                parsed[HUE_API_STATE_ON] = True
+                bri = round(bri * BRI_TO_PCT)
+                on_state = True
 
         # Choose HA domain and service
-        domain = core.DOMAIN
-        turn_on_needed = False
-        service: str | None = (
-            SERVICE_TURN_ON if parsed[HUE_API_STATE_ON] else SERVICE_TURN_OFF
-        )
         data: dict[str, Any] = {ATTR_ENTITY_ID: entity_id}
-
-        # --- Light ---
-        if entity.domain == light.DOMAIN:
-            if parsed[HUE_API_STATE_ON]:
-                if (
-                    light.brightness_supported(color_modes)
-                    and parsed[HUE_API_STATE_BRI] is not None
-                ):
-                    data[ATTR_BRIGHTNESS] = hue_brightness_to_hass(
-                        parsed[HUE_API_STATE_BRI]
-                    )
-
-                if light.color_supported(color_modes):
-                    if any((parsed[HUE_API_STATE_HUE], parsed[HUE_API_STATE_SAT])):
-                        hue = parsed[HUE_API_STATE_HUE] or 0
-                        sat = parsed[HUE_API_STATE_SAT] or 0
-                        hue = int((hue / HUE_API_STATE_HUE_MAX) * 360)
-                        sat = int((sat / HUE_API_STATE_SAT_MAX) * 100)
-                        data[ATTR_HS_COLOR] = (hue, sat)
-
-                    if parsed[HUE_API_STATE_XY] is not None:
-                        data[ATTR_XY_COLOR] = parsed[HUE_API_STATE_XY]
-
-                if (
-                    light.color_temp_supported(color_modes)
-                    and parsed[HUE_API_STATE_CT] is not None
-                ):
-                    data[ATTR_COLOR_TEMP_KELVIN] = (
-                        color_util.color_temperature_mired_to_kelvin(
-                            parsed[HUE_API_STATE_CT]
-                        )
-                    )
-
-                if (
-                    entity_features & LightEntityFeature.TRANSITION
-                    and parsed[HUE_API_STATE_TRANSITION] is not None
-                ):
-                    data[ATTR_TRANSITION] = parsed[HUE_API_STATE_TRANSITION] / 10
-
-        # --- Script ---
-        elif entity.domain == script.DOMAIN:
-            data["variables"] = {
-                "requested_state": STATE_ON if parsed[HUE_API_STATE_ON] else STATE_OFF
-            }
-            if parsed[HUE_API_STATE_BRI] is not None:
-                data["variables"]["requested_level"] = parsed[HUE_API_STATE_BRI]
-
-        # --- Climate ---
-        elif entity.domain == climate.DOMAIN:
-            service = None
-            if (
-                entity_features & ClimateEntityFeature.TARGET_TEMPERATURE
-                and parsed[HUE_API_STATE_BRI] is not None
-            ):
-                domain = entity.domain
-                service = SERVICE_SET_TEMPERATURE
-                data[ATTR_TEMPERATURE] = parsed[HUE_API_STATE_BRI]
-
-        # --- Humidifier ---
-        elif entity.domain == humidifier.DOMAIN:
-            if parsed[HUE_API_STATE_BRI] is not None:
-                turn_on_needed = True
-                domain = entity.domain
-                service = SERVICE_SET_HUMIDITY
-                data[ATTR_HUMIDITY] = parsed[HUE_API_STATE_BRI]
-
-        # --- Media Player ---
-        elif entity.domain == media_player.DOMAIN:
-            if (
-                entity_features & MediaPlayerEntityFeature.VOLUME_SET
-                and parsed[HUE_API_STATE_BRI] is not None
-            ):
-                turn_on_needed = True
-                domain = entity.domain
-                service = SERVICE_VOLUME_SET
-                data[ATTR_MEDIA_VOLUME_LEVEL] = parsed[HUE_API_STATE_BRI] / 100.0
-
-        # --- Cover ---
-        elif entity.domain == cover.DOMAIN:
-            domain = entity.domain
-            if service == SERVICE_TURN_ON:
-                service = SERVICE_OPEN_COVER
-            else:
-                service = SERVICE_CLOSE_COVER
-
-            if (
-                entity_features & CoverEntityFeature.SET_POSITION
-                and parsed[HUE_API_STATE_BRI] is not None
-            ):
-                service = SERVICE_SET_COVER_POSITION
-                data[ATTR_POSITION] = parsed[HUE_API_STATE_BRI]
-
-        # --- Fan ---
-        elif (
-            entity.domain == fan.DOMAIN
-            and entity_features & FanEntityFeature.SET_SPEED
-            and parsed[HUE_API_STATE_BRI] is not None
-        ):
-            domain = entity.domain
-            data[ATTR_PERCENTAGE] = parsed[HUE_API_STATE_BRI]
+        if handler := _DOMAIN_HANDLERS.get(entity.domain):
+            domain, service, turn_on_needed = handler(
+                data,
+                entity_features,
+                caps,
+                _ParsedPut(on_state, bri, hue, sat, ct, xy, transition),
+            )
+        else:
+            domain = core.DOMAIN
+            service = SERVICE_TURN_ON if on_state else SERVICE_TURN_OFF
+            turn_on_needed = False
 
         # Map off → on for stateless domains (scene, script)
         if entity.domain in OFF_MAPS_TO_ON_DOMAINS:
@@ -602,41 +614,178 @@ class HueOneLightChangeView(HomeAssistantView):
             )
 
         if service is not None:
-            state_will_change = parsed[HUE_API_STATE_ON] != _hass_to_hue_state(entity)
+            state_will_change = on_state != current_on
 
             await hass.services.async_call(domain, service, data, blocking=False)
 
             if state_will_change:
                 await _wait_for_state_change_or_timeout(
-                    hass, entity_id, CACHE_TIMEOUT
+                    hass, entity_id, STATE_CHANGE_TIMEOUT
                 )
 
         # Build success responses
-        json_response = [
-            _create_hue_success_response(
-                entity_number, HUE_API_STATE_ON, parsed[HUE_API_STATE_ON]
-            )
-        ]
-        for key in (
-            HUE_API_STATE_BRI,
-            HUE_API_STATE_HUE,
-            HUE_API_STATE_SAT,
-            HUE_API_STATE_CT,
-            HUE_API_STATE_XY,
-            HUE_API_STATE_TRANSITION,
-        ):
-            if parsed[key] is not None:
-                json_response.append(
-                    _create_hue_success_response(entity_number, key, parsed[key])
-                )
+        success_body = _create_hue_success_body(
+            entity_number,
+            (
+                (HUE_API_STATE_ON, on_state),
+                (HUE_API_STATE_BRI, bri),
+                (HUE_API_STATE_HUE, hue),
+                (HUE_API_STATE_SAT, sat),
+                (HUE_API_STATE_CT, ct),
+                (HUE_API_STATE_XY, xy),
+                (HUE_API_STATE_TRANSITION, transition),
+            ),
+        )
 
-        # Cache the state
-        if entity.domain in OFF_MAPS_TO_ON_DOMAINS:
-            cached_states[entity_id] = [parsed, None]
-        else:
-            cached_states[entity_id] = [parsed, time.time()]
+        # Cache (on, bri, hue, sat, ct) — stateless domains keep it until replaced
+        cached_states.set(
+            entity_id,
+            (on_state, bri, hue, sat, ct),
+            hass.loop.time(),
+            permanent=entity.domain in OFF_MAPS_TO_ON_DOMAINS,
+        )
 
-        return self.json(json_response)
+        return _json_body_response(success_body)
+
+
+# ---------------------------------------------------------------------------
+# Service dispatch
+# ---------------------------------------------------------------------------
+
+
+class _ParsedPut(NamedTuple):
+    """Fields of a light state PUT, after domain-specific interpretation."""
+
+    on_state: bool
+    bri: int | None
+    hue: int | None
+    sat: int | None
+    ct: int | None
+    xy: tuple[float, float] | None
+    transition: int | None
+
+
+# Each handler gets the entity's supported features and _CAP_* bits (0 for
+# non-light domains), fills in the service data for its domain and returns
+# (domain, service, turn_on_needed). A service of None means no call is made.
+_ServiceCallSpec = tuple[str, str | None, bool]
+
+
+def _handle_light(
+    data: dict[str, Any], entity_features: int, caps: int, put: _ParsedPut
+) -> _ServiceCallSpec:
+    """Build the light.turn_on/turn_off call."""
+    if not put.on_state:
+        return core.DOMAIN, SERVICE_TURN_OFF, False
+
+    if caps & _CAP_BRIGHTNESS and put.bri is not None:
+        data[ATTR_BRIGHTNESS] = hue_brightness_to_hass(put.bri)
+
+    if caps & _CAP_COLOR:
+        if put.hue is not None or put.sat is not None:
+            hs_hue = int((put.hue or 0) * HUE_TO_DEG)
+            hs_sat = int((put.sat or 0) * SAT_TO_PCT)
+            data[ATTR_HS_COLOR] = (hs_hue, hs_sat)
+
+        if put.xy is not None:
+            data[ATTR_XY_COLOR] = put.xy
+
+    if caps & _CAP_COLOR_TEMP and put.ct is not None:
+        data[ATTR_COLOR_TEMP_KELVIN] = color_util.color_temperature_mired_to_kelvin(
+            put.ct
+        )
+
+    if (
+        entity_features & LightEntityFeature.TRANSITION
+        and put.transition is not None
+    ):
+        data[ATTR_TRANSITION] = put.transition / 10
+
+    return core.DOMAIN, SERVICE_TURN_ON, False
+
+
+def _handle_script(
+    data: dict[str, Any], entity_features: int, caps: int, put: _ParsedPut
+) -> _ServiceCallSpec:
+    """Pass the requested state and level to the script as variables."""
+    data["variables"] = {
+        "requested_state": STATE_ON if put.on_state else STATE_OFF
+    }
+    if put.bri is not None:
+        data["variables"]["requested_level"] = put.bri
+    # Scripts are stateless, so off always maps to turn_on
+    return core.DOMAIN, SERVICE_TURN_ON, False
+
+
+def _handle_climate(
+    data: dict[str, Any], entity_features: int, caps: int, put: _ParsedPut
+) -> _ServiceCallSpec:
+    """Map brightness to the target temperature; on/off is ignored."""
+    if (
+        entity_features & ClimateEntityFeature.TARGET_TEMPERATURE
+        and put.bri is not None
+    ):
+        data[ATTR_TEMPERATURE] = put.bri
+        return climate.DOMAIN, SERVICE_SET_TEMPERATURE, False
+    return core.DOMAIN, None, False
+
+
+def _handle_humidifier(
+    data: dict[str, Any], entity_features: int, caps: int, put: _ParsedPut
+) -> _ServiceCallSpec:
+    """Map brightness to the target humidity."""
+    if put.bri is not None:
+        data[ATTR_HUMIDITY] = put.bri
+        return humidifier.DOMAIN, SERVICE_SET_HUMIDITY, True
+    return core.DOMAIN, SERVICE_TURN_ON if put.on_state else SERVICE_TURN_OFF, False
+
+
+def _handle_media_player(
+    data: dict[str, Any], entity_features: int, caps: int, put: _ParsedPut
+) -> _ServiceCallSpec:
+    """Map brightness to the volume level."""
+    if entity_features & MediaPlayerEntityFeature.VOLUME_SET and put.bri is not None:
+        data[ATTR_MEDIA_VOLUME_LEVEL] = put.bri / 100.0
+        return media_player.DOMAIN, SERVICE_VOLUME_SET, True
+    return core.DOMAIN, SERVICE_TURN_ON if put.on_state else SERVICE_TURN_OFF, False
+
+
+def _handle_cover(
+    data: dict[str, Any], entity_features: int, caps: int, put: _ParsedPut
+) -> _ServiceCallSpec:
+    """Map on/off to open/close and brightness to the position."""
+    if entity_features & CoverEntityFeature.SET_POSITION and put.bri is not None:
+        data[ATTR_POSITION] = put.bri
+        return cover.DOMAIN, SERVICE_SET_COVER_POSITION, False
+    return (
+        cover.DOMAIN,
+        SERVICE_OPEN_COVER if put.on_state else SERVICE_CLOSE_COVER,
+        False,
+    )
+
+
+def _handle_fan(
+    data: dict[str, Any], entity_features: int, caps: int, put: _ParsedPut
+) -> _ServiceCallSpec:
+    """Map brightness to the fan speed percentage."""
+    service = SERVICE_TURN_ON if put.on_state else SERVICE_TURN_OFF
+    if entity_features & FanEntityFeature.SET_SPEED and put.bri is not None:
+        data[ATTR_PERCENTAGE] = put.bri
+        return fan.DOMAIN, service, False
+    return core.DOMAIN, service, False
+
+
+_DOMAIN_HANDLERS: dict[
+    str, Callable[[dict[str, Any], int, int, _ParsedPut], _ServiceCallSpec]
+] = {
+    light.DOMAIN: _handle_light,
+    script.DOMAIN: _handle_script,
+    climate.DOMAIN: _handle_climate,
+    humidifier.DOMAIN: _handle_humidifier,
+    media_player.DOMAIN: _handle_media_player,
+    cover.DOMAIN: _handle_cover,
+    fan.DOMAIN: _handle_fan,
+}
 
 
 # ---------------------------------------------------------------------------
@@ -644,50 +793,39 @@ class HueOneLightChangeView(HomeAssistantView):
 # ---------------------------------------------------------------------------
 
 
+def _unreachable_device_json(name: str, unique_id: str) -> dict[str, Any]:
+    """Return the Hue JSON for an unlinked device or one whose entity is gone."""
+    return {
+        **_UNREACHABLE_TEMPLATE,
+        # Copied so callers can modify the result without touching the template
+        "state": dict(_UNREACHABLE_TEMPLATE["state"]),
+        "name": name,
+        "uniqueid": unique_id,
+    }
+
+
 def device_to_json(
     hass: core.HomeAssistant,
     device: HueDevice,
-    cached_states: dict[str, list],
+    cached_states: TTLCache,
+    now: float,
 ) -> dict[str, Any]:
-    """Convert a HueDevice to full Hue bridge JSON representation."""
-    unique_id = _entity_unique_id(device.hue_id)
+    """Convert a HueDevice to full Hue bridge JSON representation.
+
+    now is the event loop time used to expire cached PUT states.
+    """
+    unique_id = device.unique_id_hue_format
 
     # Unlinked device — report as off / unreachable dimmable light
     if not device.entity_id:
-        return {
-            "state": {
-                HUE_API_STATE_ON: False,
-                "reachable": False,
-                "mode": "homeautomation",
-                HUE_API_STATE_BRI: 0,
-            },
-            "name": device.name,
-            "uniqueid": unique_id,
-            "manufacturername": "Home Assistant",
-            "swversion": "123",
-            "type": "Dimmable light",
-            "modelid": "HASS123",
-        }
+        return _unreachable_device_json(device.name, unique_id)
 
     state = hass.states.get(device.entity_id)
     if state is None:
-        return {
-            "state": {
-                HUE_API_STATE_ON: False,
-                "reachable": False,
-                "mode": "homeautomation",
-                HUE_API_STATE_BRI: 0,
-            },
-            "name": device.name,
-            "uniqueid": unique_id,
-            "manufacturername": "Home Assistant",
-            "swversion": "123",
-            "type": "Dimmable light",
-            "modelid": "HASS123",
-        }
+        return _unreachable_device_json(device.name, unique_id)
 
-    color_modes = state.attributes.get(light.ATTR_SUPPORTED_COLOR_MODES) or []
-    state_dict = _get_entity_state_dict(state, cached_states)
+    caps = _light_caps(state)
+    state_dict = _get_entity_state_dict(state, cached_states, now)
 
     json_state: dict[str, str | bool | int] = {
         HUE_API_STATE_ON: state_dict[HUE_API_STATE_ON],
@@ -703,11 +841,7 @@ def device_to_json(
         "swversion": "123",
     }
 
-    is_light_domain = state.domain == light.DOMAIN
-    color_supported = is_light_domain and light.color_supported(color_modes)
-    color_temp_supported = is_light_domain and light.color_temp_supported(color_modes)
-
-    if color_supported and color_temp_supported:
+    if caps & _CAP_COLOR and caps & _CAP_COLOR_TEMP:
         retval["type"] = "Extended color light"
         retval["modelid"] = "HASS231"
         json_state.update(
@@ -724,7 +858,7 @@ def device_to_json(
         else:
             json_state[HUE_API_STATE_COLORMODE] = "ct"
 
-    elif color_supported:
+    elif caps & _CAP_COLOR:
         retval["type"] = "Color light"
         retval["modelid"] = "HASS213"
         json_state.update(
@@ -737,7 +871,7 @@ def device_to_json(
             }
         )
 
-    elif color_temp_supported:
+    elif caps & _CAP_COLOR_TEMP:
         retval["type"] = "Color temperature light"
         retval["modelid"] = "HASS312"
         json_state.update(
@@ -748,7 +882,7 @@ def device_to_json(
             }
         )
 
-    elif _state_supports_hue_brightness(state, color_modes):
+    elif _state_supports_hue_brightness(state, caps):
         retval["type"] = "Dimmable light"
         retval["modelid"] = "HASS123"
         json_state.update({HUE_API_STATE_BRI: state_dict[HUE_API_STATE_BRI]})
@@ -762,6 +896,34 @@ def device_to_json(
     return retval
 
 
+def device_to_json_bytes(
+    hass: core.HomeAssistant,
+    device: HueDevice,
+    cached_states: TTLCache,
+    now: float,
+) -> bytes:
+    """Return the encoded Hue JSON for a device, reusing it while unchanged.
+
+    A recent PUT overrides the entity state, so only plain entity state is
+    cached per device, keyed on when that state last changed.
+    """
+    entity_id = device.entity_id
+    if (
+        entity_id is None
+        or entity_id in cached_states
+        or (state := hass.states.get(entity_id)) is None
+    ):
+        return json_bytes(device_to_json(hass, device, cached_states, now))
+
+    last_updated = state.last_updated_timestamp
+    if (json_cache := device.json_cache) is not None and json_cache[0] == last_updated:
+        return json_cache[1]
+
+    encoded = json_bytes(device_to_json(hass, device, cached_states, now))
+    device.json_cache = (last_updated, encoded)
+    return encoded
+
+
 # ---------------------------------------------------------------------------
 # Internal helpers
 # ---------------------------------------------------------------------------
@@ -769,204 +931,240 @@ def device_to_json(
 
 def _get_entity_state_dict(
     entity: State,
-    cached_states: dict[str, list],
+    cached_states: TTLCache,
+    now: float,
 ) -> dict[str, Any]:
     """Get the state dict for an entity, respecting the short-lived cache."""
-    cached_entry = cached_states.get(entity.entity_id)
-    cached = None
-
-    if cached_entry is not None:
-        entry_state, entry_time = cached_entry
-        if entry_time is None:
-            # Permanent cache for off-maps-to-on domains
-            cached = entry_state
-        elif (
-            time.time() - entry_time < CACHE_TIMEOUT
-            and entry_state[HUE_API_STATE_ON] == _hass_to_hue_state(entity)
-        ):
-            cached = entry_state
-        else:
-            cached_states.pop(entity.entity_id)
+    is_on = _hass_to_hue_state(entity)
+    cached = cached_states.get(entity.entity_id, now)
+
+    # Off-maps-to-on domains are cached permanently; anything else is
+    # dropped as soon as the real on/off state disagrees with it
+    if (
+        cached is not None
+        and entity.domain not in OFF_MAPS_TO_ON_DOMAINS
+        and cached[0] != is_on
+    ):
+        cached_states.pop(entity.entity_id)
+        cached = None
 
     if cached is None:
-        return _build_entity_state_dict(entity)
-
-    data: dict[str, Any] = cached
-    if data[HUE_API_STATE_BRI] is None:
-        data[HUE_API_STATE_BRI] = HUE_API_STATE_BRI_MAX if data[HUE_API_STATE_ON] else 0
-    if data[HUE_API_STATE_HUE] is None or data[HUE_API_STATE_SAT] is None:
-        data[HUE_API_STATE_HUE] = 0
-        data[HUE_API_STATE_SAT] = 0
-    if data[HUE_API_STATE_BRI] == 0:
-        data[HUE_API_STATE_HUE] = 0
-        data[HUE_API_STATE_SAT] = 0
-    _clamp_values(data)
-    return data
-
-
-def _build_entity_state_dict(entity: State) -> dict[str, Any]:
+        return _build_entity_state_dict(entity, is_on)
+
+    cached_on, bri, hue, sat, ct = cached
+    if bri is None:
+        bri = HUE_API_STATE_BRI_MAX if cached_on else 0
+    if hue is None or sat is None or bri == 0:
+        hue = sat = 0
+    return _hue_state_dict(cached_on, bri, hue, sat, ct)
+
+
+def _build_entity_state_dict(entity: State, is_on: bool) -> dict[str, Any]:
     """Build a state dict from current HA entity state."""
-    is_on = _hass_to_hue_state(entity)
-    data: dict[str, Any] = {
-        HUE_API_STATE_ON: is_on,
-        HUE_API_STATE_BRI: None,
-        HUE_API_STATE_HUE: None,
-        HUE_API_STATE_SAT: None,
-        HUE_API_STATE_CT: None,
-    }
-    attributes = entity.attributes
+    get_attr = entity.attributes.get
 
     if is_on:
-        data[HUE_API_STATE_BRI] = hass_to_hue_brightness(
-            attributes.get(ATTR_BRIGHTNESS) or 0
-        )
-        if (hue_sat := attributes.get(ATTR_HS_COLOR)) is not None:
+        bri = hass_to_hue_brightness(get_attr(ATTR_BRIGHTNESS) or 0)
+        if (hue_sat := get_attr(ATTR_HS_COLOR)) is not None:
             h, s = hue_sat
-            data[HUE_API_STATE_HUE] = int((h / 360.0) * HUE_API_STATE_HUE_MAX)
-            data[HUE_API_STATE_SAT] = int((s / 100.0) * HUE_API_STATE_SAT_MAX)
+            hue = int(h * DEG_TO_HUE)
+            sat = int(s * PCT_TO_SAT)
         else:
-            data[HUE_API_STATE_HUE] = HUE_API_STATE_HUE_MIN
-            data[HUE_API_STATE_SAT] = HUE_API_STATE_SAT_MIN
+            hue = HUE_API_STATE_HUE_MIN
+            sat = HUE_API_STATE_SAT_MIN
 
-        kelvin = attributes.get(ATTR_COLOR_TEMP_KELVIN)
-        data[HUE_API_STATE_CT] = (
+        kelvin = get_attr(ATTR_COLOR_TEMP_KELVIN)
+        ct = (
             color_util.color_temperature_kelvin_to_mired(kelvin)
             if kelvin is not None
             else 0
         )
     else:
-        data[HUE_API_STATE_BRI] = 0
-        data[HUE_API_STATE_HUE] = 0
-        data[HUE_API_STATE_SAT] = 0
-        data[HUE_API_STATE_CT] = 0
+        bri = hue = sat = ct = 0
 
     # Domain-specific brightness overrides
-    if entity.domain == climate.DOMAIN:
-        temperature = attributes.get(ATTR_TEMPERATURE, 0)
-        data[HUE_API_STATE_BRI] = round(temperature * HUE_API_STATE_BRI_MAX / 100)
-    elif entity.domain == humidifier.DOMAIN:
-        humidity = attributes.get(ATTR_HUMIDITY, 0)
-        data[HUE_API_STATE_BRI] = round(humidity * HUE_API_STATE_BRI_MAX / 100)
-    elif entity.domain == media_player.DOMAIN:
-        level = attributes.get(ATTR_MEDIA_VOLUME_LEVEL, 1.0 if is_on else 0.0)
-        data[HUE_API_STATE_BRI] = round(min(1.0, level) * HUE_API_STATE_BRI_MAX)
-    elif entity.domain == fan.DOMAIN:
-        percentage = attributes.get(ATTR_PERCENTAGE) or 0
-        data[HUE_API_STATE_BRI] = round(percentage * HUE_API_STATE_BRI_MAX / 100)
-    elif entity.domain == cover.DOMAIN:
-        level = attributes.get(ATTR_CURRENT_POSITION, 0)
-        data[HUE_API_STATE_BRI] = round(level / 100 * HUE_API_STATE_BRI_MAX)
-
-    _clamp_values(data)
-    return data
-
-
-def _clamp_values(data: dict[str, Any]) -> None:
-    """Clamp brightness, hue, saturation, and color temp to valid API ranges."""
-    for key, v_min, v_max in (
-        (HUE_API_STATE_BRI, HUE_API_STATE_BRI_MIN, HUE_API_STATE_BRI_MAX),
-        (HUE_API_STATE_HUE, HUE_API_STATE_HUE_MIN, HUE_API_STATE_HUE_MAX),
-        (HUE_API_STATE_SAT, HUE_API_STATE_SAT_MIN, HUE_API_STATE_SAT_MAX),
-        (HUE_API_STATE_CT, HUE_API_STATE_CT_MIN, HUE_API_STATE_CT_MAX),
-    ):
-        if data[key] is not None:
-            data[key] = max(v_min, min(data[key], v_max))
+    domain = entity.domain
+    if domain == climate.DOMAIN:
+        temperature = get_attr(ATTR_TEMPERATURE, 0)
+        bri = round(temperature * PCT_TO_BRI)
+    elif domain == humidifier.DOMAIN:
+        humidity = get_attr(ATTR_HUMIDITY, 0)
+        bri = round(humidity * PCT_TO_BRI)
+    elif domain == media_player.DOMAIN:
+        level = get_attr(ATTR_MEDIA_VOLUME_LEVEL, 1.0 if is_on else 0.0)
+        bri = round(min(1.0, level) * HUE_API_STATE_BRI_MAX)
+    elif domain == fan.DOMAIN:
+        percentage = get_attr(ATTR_PERCENTAGE) or 0
+        bri = round(percentage * PCT_TO_BRI)
+    elif domain == cover.DOMAIN:
+        level = get_attr(ATTR_CURRENT_POSITION, 0)
+        bri = round(level * PCT_TO_BRI)
+
+    return _hue_state_dict(is_on, bri, hue, sat, ct)
+
+
+def _hue_state_dict(
+    is_on: bool, bri: int, hue: int, sat: int, ct: int | None,
+) -> dict[str, Any]:
+    """Build a state dict, clamping values to the valid API ranges.
+
+    A cached PUT that never set a color temperature leaves ct as None.
+    """
+    return {
+        HUE_API_STATE_ON: is_on,
+        HUE_API_STATE_BRI: max(HUE_API_STATE_BRI_MIN, min(bri, HUE_API_STATE_BRI_MAX)),
+        HUE_API_STATE_HUE: max(HUE_API_STATE_HUE_MIN, min(hue, HUE_API_STATE_HUE_MAX)),
+        HUE_API_STATE_SAT: max(HUE_API_STATE_SAT_MIN, min(sat, HUE_API_STATE_SAT_MAX)),
+        HUE_API_STATE_CT: (
+            max(HUE_API_STATE_CT_MIN, min(ct, HUE_API_STATE_CT_MAX))
+            if ct is not None
+            else None
+        ),
+    }
+
+
+def _parse_int_field(request_json: dict[str, Any], key: str) -> int | None:
+    """Return request_json[key] as an int, or None if the key is absent."""
+    if key not in request_json:
+        return None
+    return int(request_json[key])
+
+
+def _light_caps(state: State) -> int:
+    """Return the _CAP_* bitmask for a light's supported color modes.
+
+    Non-light entities report no capabilities.
+    """
+    if state.domain != light.DOMAIN:
+        return 0
+    color_modes = state.attributes.get(light.ATTR_SUPPORTED_COLOR_MODES) or []
+    caps = 0
+    if light.brightness_supported(color_modes):
+        caps |= _CAP_BRIGHTNESS
+    if light.color_supported(color_modes):
+        caps |= _CAP_COLOR
+    if light.color_temp_supported(color_modes):
+        caps |= _CAP_COLOR_TEMP
+    return caps
 
 
-def _state_supports_hue_brightness(
-    state: State, color_modes: list[ColorMode],
-) -> bool:
+def _state_supports_hue_brightness(state: State, caps: int) -> bool:
     """Return True if the entity supports brightness in Hue terms."""
     domain = state.domain
     if domain == light.DOMAIN:
-        return light.brightness_supported(color_modes)
+        return bool(caps & _CAP_BRIGHTNESS)
     if not (required_feature := DIMMABLE_SUPPORTED_FEATURES_BY_DOMAIN.get(domain)):
         return False
+    # Test the flag bit directly rather than building the feature enum
     features = state.attributes.get(ATTR_SUPPORTED_FEATURES, 0)
-    enum = ENTITY_FEATURES_BY_DOMAIN[domain]
-    features = enum(features) if type(features) is int else features
-    return required_feature in features
+    return bool(features & required_feature)
 
 
 def _hass_to_hue_state(entity: State) -> bool:
     """Convert HA entity state to Hue on/off boolean."""
-    return entity.state != _OFF_STATES.get(entity.domain, STATE_OFF)
+    return entity.state != _off_state_for_domain(entity.domain, STATE_OFF)
 
 
-@lru_cache(maxsize=1024)
-def _entity_unique_id(hue_id: str) -> str:
-    """Generate a Hue-format unique ID from a device's hue_id."""
-    unique_id = hashlib.md5(
-        f"ha_emulated_hue_{hue_id}".encode()
-    ).hexdigest()
-    return (
-        f"00:{unique_id[0:2]}:{unique_id[2:4]}:"
-        f"{unique_id[4:6]}:{unique_id[6:8]}:{unique_id[8:10]}:"
-        f"{unique_id[10:12]}:{unique_id[12:14]}-{unique_id[14:16]}"
+def _create_hue_success_body(
+    entity_number: str, items: Iterable[tuple[str, Any]],
+) -> bytes:
+    """Encode the success array for the attributes set on a light.
+
+    Each entry is {"success": {"/lights/<n>/state/<attr>": value}}. Only the
+    values go through the JSON encoder; the static parts are joined as bytes.
+    entity_number is a known device ID, so it needs no escaping.
+    """
+    prefix = b'{"success":{"/lights/%b/state/' % entity_number.encode()
+    return b"[%b]" % b",".join(
+        b'%b%b":%b}}' % (prefix, _SUCCESS_ATTRS[attr], json_bytes(value))
+        for attr, value in items
+        if value is not None
     )
 
 
-def _create_hue_success_response(
-    entity_number: str, attr: str, value: Any,
-) -> dict[str, Any]:
-    """Create a success response for an attribute set on a light."""
-    success_key = f"/lights/{entity_number}/state/{attr}"
-    return {"success": {success_key: value}}
+def _create_config_body(request: web.Request) -> bytes:
+    """Return the encoded bridge config response."""
+    return _encode_config(
+        request.app[KEY_ADVERTISE_IP], request.app[KEY_ADVERTISE_PORT]
+    )
 
 
-def _create_config_model(request: web.Request) -> dict[str, Any]:
-    """Create the bridge config response."""
-    advertise_ip = request.app[KEY_ADVERTISE_IP]
-    advertise_port = request.app[KEY_ADVERTISE_PORT]
-    return {
-        "name": "HASS BRIDGE",
-        "mac": "00:00:00:00:00:00",
-        "swversion": "01003542",
-        "apiversion": "1.17.0",
-        "whitelist": {HUE_API_USERNAME: {"name": "HASS BRIDGE"}},
-        "ipaddress": f"{advertise_ip}:{advertise_port}",
-        "linkbutton": True,
-    }
+@lru_cache(maxsize=4)
+def _encode_config(advertise_ip: str, advertise_port: int) -> bytes:
+    """Encode the bridge config, which only depends on the advertised address."""
+    return json_bytes(
+        {
+            "name": "HASS BRIDGE",
+            "mac": "00:00:00:00:00:00",
+            "swversion": "01003542",
+            "apiversion": "1.17.0",
+            "whitelist": {HUE_API_USERNAME: {"name": "HASS BRIDGE"}},
+            "ipaddress": f"{advertise_ip}:{advertise_port}",
+            "linkbutton": True,
+        }
+    )
 
 
-def _create_list_of_entities(request: web.Request) -> dict[str, Any]:
-    """Create a dict of all linked devices as Hue light resources."""
+def _create_list_of_entities(request: web.Request) -> bytes:
+    """Encode all linked devices as a JSON object of Hue light resources.
+
+    The object is assembled from each device's cached encoding rather than
+    re-serializing every device on every poll.
+    """
     hass = request.app[KEY_HASS]
     device_manager: HueDeviceManager = request.app[KEY_DEVICE_MANAGER]
-    cached_states: dict[str, list] = request.app[KEY_CACHED_STATES]
+    cached_states: TTLCache = request.app[KEY_CACHED_STATES]
+    now = hass.loop.time()
+
+    return b"{%b}" % b",".join(
+        b'"%b":%b'
+        % (
+            device.hue_id.encode(),
+            device_to_json_bytes(hass, device, cached_states, now),
+        )
+        for device in device_manager.get_all_devices()
+        if device.is_linked
+    )
 
-    result: dict[str, Any] = {}
-    for device in device_manager.get_all_devices():
-        if device.is_linked:
-            result[device.hue_id] = device_to_json(hass, device, cached_states)
-    return result
+
+# Brightness lookup tables, indexed by the integer source value
+_HUE_TO_HASS_BRI = tuple(
+    min(255, round(value * BRI_TO_HASS))
+    for value in range(HUE_API_STATE_BRI_MAX + 1)
+)
+_HASS_TO_HUE_BRI = tuple(max(1, round(value * HASS_TO_BRI)) for value in range(256))
 
 
 def hue_brightness_to_hass(value: int) -> int:
     """Convert Hue brightness 1..254 to HA format 0..255."""
-    return min(255, round((value / HUE_API_STATE_BRI_MAX) * 255))
+    if type(value) is int and 0 <= value <= HUE_API_STATE_BRI_MAX:
+        return _HUE_TO_HASS_BRI[value]
+    return min(255, round(value * BRI_TO_HASS))
 
 
 def hass_to_hue_brightness(value: int) -> int:
     """Convert HA brightness 0..255 to Hue 1..254 scale."""
-    return max(1, round((value / 255) * HUE_API_STATE_BRI_MAX))
+    if type(value) is int and 0 <= value <= 255:
+        return _HASS_TO_HUE_BRI[value]
+    return max(1, round(value * HASS_TO_BRI))
 
 
 async def _wait_for_state_change_or_timeout(
     hass: core.HomeAssistant, entity_id: str, timeout: float,
 ) -> None:
     """Wait for an entity to change state or timeout."""
-    ev = asyncio.Event()
+    changed: asyncio.Future[None] = hass.loop.create_future()
 
     @core.callback
     def _async_event_changed(event: Event[EventStateChangedData]) -> None:
-        ev.set()
+        if not changed.done():
+            changed.set_result(None)
 
     unsub = async_track_state_change_event(hass, [entity_id], _async_event_changed)
 
     try:
-        async with asyncio.timeout(STATE_CHANGE_TIMEOUT):
-            await ev.wait()
+        async with asyncio.timeout(timeout):
+            await changed
     except TimeoutError:
         pass
     finally:
@@ -1,7 +1,9 @@
 """Hue device representation for Emulated Hue +."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import datetime
+import hashlib
 from typing import Any
 
 from homeassistant.core import HomeAssistant
@@ -12,6 +14,8 @@ from homeassistant.components.light import (
     ATTR_COLOR_TEMP_KELVIN,
 )
 
+from .const import DEG_TO_HUE, PCT_TO_SAT
+
 
 @dataclass
 class HueDevice:
@@ -25,15 +29,39 @@ class HueDevice:
     modified_at: str = ""
     last_accessed_at: str | None = None
     last_accessed_by: str | None = None
+    int_hue_id: int = field(init=False, repr=False, compare=False)
+    # Hue-format uniqueid reported to clients, derived from hue_id
+    unique_id_hue_format: str = field(init=False, repr=False, compare=False)
+    _last_accessed_ts: float | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Last encoded Hue JSON for the linked entity, keyed on its last_updated
+    json_cache: tuple[float, bytes] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Last to_dict() result, cleared whenever a stored field changes
+    _stored_dict: dict[str, Any] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def __post_init__(self):
         """Set timestamps if not provided."""
-        import datetime
-        now = datetime.datetime.now().isoformat()
-        if not self.created_at:
-            self.created_at = now
-        if not self.modified_at:
-            self.modified_at = now
+        self.int_hue_id = int(self.hue_id)
+        self.unique_id_hue_format = _hue_format_unique_id(self.hue_id)
+        # Stored devices already have both, so only new ones read the clock
+        if not self.created_at or not self.modified_at:
+            now = _now_iso()
+            if not self.created_at:
+                self.created_at = now
+            if not self.modified_at:
+                self.modified_at = now
+        if self.last_accessed_at:
+            try:
+                self._last_accessed_ts = datetime.datetime.fromisoformat(
+                    self.last_accessed_at
+                ).timestamp()
+            except (ValueError, TypeError):
+                self._last_accessed_ts = None
     
     @property
     def is_linked(self) -> bool:
@@ -44,25 +72,38 @@ class HueDevice:
     def unique_id(self) -> str:
         """Return unique ID for this Hue device."""
         return f"ha_emulated_hue_{self.hue_id}"
+
+    @property
+    def last_accessed_ts(self) -> float | None:
+        """Return the last access time as a POSIX timestamp, if known."""
+        return self._last_accessed_ts
     
     def record_access(self, client_ip: str) -> None:
         """Record an API access from a client."""
-        import datetime
-        self.last_accessed_at = datetime.datetime.now().isoformat()
+        now = datetime.datetime.now()
+        self.last_accessed_at = now.isoformat()
+        self._last_accessed_ts = now.timestamp()
         self.last_accessed_by = client_ip
+        self._stored_dict = None
 
     def to_dict(self) -> dict[str, Any]:
-        """Convert to dictionary for storage."""
-        return {
-            "hue_id": self.hue_id,
-            "name": self.name,
-            "entity_id": self.entity_id,
-            "device_type": self.device_type,
-            "created_at": self.created_at,
-            "modified_at": self.modified_at,
-            "last_accessed_at": self.last_accessed_at,
-            "last_accessed_by": self.last_accessed_by,
-        }
+        """Convert to dictionary for storage.
+
+        The dict is reused until the device changes, so callers must not
+        modify it.
+        """
+        if self._stored_dict is None:
+            self._stored_dict = {
+                "hue_id": self.hue_id,
+                "name": self.name,
+                "entity_id": self.entity_id,
+                "device_type": self.device_type,
+                "created_at": self.created_at,
+                "modified_at": self.modified_at,
+                "last_accessed_at": self.last_accessed_at,
+                "last_accessed_by": self.last_accessed_by,
+            }
+        return self._stored_dict
     
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "HueDevice":
@@ -101,30 +142,29 @@ class HueDevice:
             "reachable": True,
         }
         
+        attrs = state.attributes
+
         # Add brightness if available
-        if ATTR_BRIGHTNESS in state.attributes:
+        if (brightness := attrs.get(ATTR_BRIGHTNESS)) is not None:
             # Convert 0-255 to 1-254 (Hue range)
-            brightness = state.attributes[ATTR_BRIGHTNESS]
             hue_state["bri"] = max(1, min(254, int(brightness)))
-        elif state.state == STATE_ON:
+        elif hue_state["on"]:
             hue_state["bri"] = 254
         else:
             hue_state["bri"] = 0
         
         # Add color information if available
-        if ATTR_HS_COLOR in state.attributes:
-            h, s = state.attributes[ATTR_HS_COLOR]
-            hue_state["hue"] = int(h / 360 * 65535)  # Convert to 0-65535
-            hue_state["sat"] = int(s / 100 * 254)    # Convert to 0-254
+        if (hs_color := attrs.get(ATTR_HS_COLOR)) is not None:
+            h, s = hs_color
+            hue_state["hue"] = int(h * DEG_TO_HUE)  # Convert to 0-65535
+            hue_state["sat"] = int(s * PCT_TO_SAT)  # Convert to 0-254
             hue_state["colormode"] = "hs"
-        elif ATTR_COLOR_TEMP_KELVIN in state.attributes:
+        elif (kelvin := attrs.get(ATTR_COLOR_TEMP_KELVIN)) is not None:
             # HA 2024+: color_temp_kelvin is in Kelvin, convert to mireds
-            kelvin = state.attributes[ATTR_COLOR_TEMP_KELVIN]
-            hue_state["ct"] = max(153, min(500, int(1000000 / kelvin)))
+            hue_state["ct"] = max(153, min(500, int(1_000_000 // kelvin)))
             hue_state["colormode"] = "ct"
-        elif "color_temp" in state.attributes:
+        elif (mired := attrs.get("color_temp")) is not None:
             # Fallback: color_temp is in mireds (deprecated in HA 2026.1)
-            mired = state.attributes["color_temp"]
             hue_state["ct"] = max(153, min(500, int(mired)))
             hue_state["colormode"] = "ct"
         
@@ -132,12 +172,32 @@ class HueDevice:
     
     def update_name(self, new_name: str) -> None:
         """Update the device name."""
-        import datetime
         self.name = new_name
-        self.modified_at = datetime.datetime.now().isoformat()
+        self.json_cache = None
+        self._stored_dict = None
+        self.modified_at = _now_iso()
     
     def update_entity_link(self, entity_id: str | None) -> None:
         """Update the linked Home Assistant entity."""
-        import datetime
         self.entity_id = entity_id
-        self.modified_at = datetime.datetime.now().isoformat()
\ No newline at end of file
+        self.json_cache = None
+        self._stored_dict = None
+        self.modified_at = _now_iso()
+
+
+def _now_iso() -> str:
+    """Return the current local time as an ISO 8601 string."""
+    return datetime.datetime.now().isoformat()
+
+
+def _hue_format_unique_id(hue_id: str) -> str:
+    """Generate a Hue-format unique ID from a device's hue_id.
+
+    The ID must stay stable across releases, as Alexa keys devices on it.
+    """
+    pairs = (
+        hashlib.md5(b"ha_emulated_hue_" + hue_id.encode(), usedforsecurity=False)
+        .digest()[:8]
+        .hex(":")
+    )
+    return f"00:{pairs[:20]}-{pairs[21:]}"
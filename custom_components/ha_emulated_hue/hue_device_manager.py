@@ -1,19 +1,29 @@
 """Manages Hue devices and ID assignments for Emulated Hue +."""
 from __future__ import annotations
 
+from bisect import insort
 import logging
 from enum import Enum
+from operator import attrgetter
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN, STORAGE_KEY, STORAGE_VERSION, SUPPORTED_DOMAINS
+from .const import (
+    DOMAIN,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    SUPPORTED_DOMAINS,
+)
 from .hue_device import HueDevice
 
 _LOGGER = logging.getLogger(__name__)
 
+_hue_id_sort_key = attrgetter("int_hue_id")
+
 
 class _Sentinel(Enum):
     """Sentinel value for distinguishing 'not provided' from None."""
@@ -32,8 +42,14 @@ class HueDeviceManager:
         
         # Device storage
         self._devices: dict[str, HueDevice] = {}
+        # Linked entity_id -> device, kept in step with _devices
+        self._entity_index: dict[str, HueDevice] = {}
         self._retired_ids: set[str] = set()
+        # The same IDs in numeric order, as persisted, plus the highest one
+        self._retired_ids_sorted: list[str] = []
+        self._max_retired_id = 0
         self._next_id_counter = 1
+        self._sorted_devices: tuple[HueDevice, ...] | None = None
         
     async def async_setup(self) -> None:
         """Set up the device manager."""
@@ -63,14 +79,26 @@ class HueDeviceManager:
             devices_data = data.get("devices", {})
             for device_id, device_data in devices_data.items():
                 self._devices[device_id] = HueDevice.from_dict(device_data)
+            self._sorted_devices = None
+            self._entity_index = {
+                device.entity_id: device
+                for device in self._devices.values()
+                if device.entity_id
+            }
                 
             # Load retired IDs
             self._retired_ids = set(data.get("retired_ids", []))
+            self._retired_ids_sorted = sorted(self._retired_ids, key=int)
+            self._max_retired_id = (
+                int(self._retired_ids_sorted[-1]) if self._retired_ids_sorted else 0
+            )
             
             # Update ID counter
-            all_ids = set(self._devices.keys()) | self._retired_ids
-            if all_ids:
-                max_id = max(int(id_str) for id_str in all_ids)
+            max_device_id = max(
+                (device.int_hue_id for device in self._devices.values()), default=0
+            )
+            max_id = max(self._max_retired_id, max_device_id)
+            if max_id:
                 self._next_id_counter = max_id + 1
                 
             _LOGGER.info(
@@ -84,31 +112,44 @@ class HueDeviceManager:
             _LOGGER.error("Failed to load device data: %s", err)
             
     async def _save_data(self) -> None:
-        """Save device data to storage."""
+        """Save device data to storage now, replacing any pending save."""
         try:
-            data = {
-                "devices": {
-                    device_id: device.to_dict()
-                    for device_id, device in self._devices.items()
-                },
-                "retired_ids": list(self._retired_ids),
-                "next_id_counter": self._next_id_counter,
-            }
-            await self._store.async_save(data)
+            await self._store.async_save(self._data_to_save())
             _LOGGER.debug("Saved device data successfully")
             
         except Exception as err:
             _LOGGER.error("Failed to save device data: %s", err)
+
+    @callback
+    def _schedule_save(self) -> None:
+        """Save device data after a short delay, coalescing bursts of changes."""
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to write to storage."""
+        return {
+            "devices": {
+                device_id: device.to_dict()
+                for device_id, device in self._devices.items()
+            },
+            # Copied, as the write may happen after further deletes
+            "retired_ids": list(self._retired_ids_sorted),
+            "next_id_counter": self._next_id_counter,
+        }
             
     def _generate_hue_id(self) -> str:
-        """Generate a new unique Hue ID."""
-        while True:
+        """Generate a new unique Hue ID.
+
+        The counter normally starts above every device and retired ID, but a
+        load that failed part-way can leave it behind, so skip IDs in use.
+        """
+        hue_id = str(self._next_id_counter)
+        self._next_id_counter += 1
+        while hue_id in self._devices or hue_id in self._retired_ids:
             hue_id = str(self._next_id_counter)
             self._next_id_counter += 1
-            
-            # Ensure ID is not in use or retired
-            if hue_id not in self._devices and hue_id not in self._retired_ids:
-                return hue_id
+        return hue_id
                 
     async def async_create_hue_device(
         self,
@@ -119,21 +160,26 @@ class HueDeviceManager:
         hue_id = self._generate_hue_id()
         
         # Validate entity if provided
+        device_type = "light"
         if entity_id:
-            if not self._is_valid_entity(entity_id):
+            if not (domain := self._supported_entity_domain(entity_id)):
                 raise ValueError(f"Entity {entity_id} is not valid or not supported")
             if self._is_entity_already_linked(entity_id):
                 raise ValueError(f"Entity {entity_id} is already linked to another Hue device")
+            device_type = domain
         
         device = HueDevice(
             hue_id=hue_id,
             name=name,
             entity_id=entity_id,
-            device_type=self._get_device_type(entity_id) if entity_id else "light"
+            device_type=device_type,
         )
         
         self._devices[hue_id] = device
-        await self._save_data()
+        self._sorted_devices = None
+        if entity_id:
+            self._entity_index[entity_id] = device
+        self._schedule_save()
         
         _LOGGER.info("Created Hue device: %s (ID: %s, Entity: %s)", name, hue_id, entity_id)
         return device
@@ -144,8 +190,13 @@ class HueDeviceManager:
             return False
             
         device = self._devices.pop(hue_id)
+        self._sorted_devices = None
+        if device.entity_id:
+            self._entity_index.pop(device.entity_id, None)
         self._retired_ids.add(hue_id)
-        await self._save_data()
+        insort(self._retired_ids_sorted, hue_id, key=int)
+        self._max_retired_id = max(self._max_retired_id, int(hue_id))
+        self._schedule_save()
         
         _LOGGER.info("Deleted Hue device: %s (ID: %s - permanently retired)", device.name, hue_id)
         return True
@@ -174,7 +225,7 @@ class HueDeviceManager:
             and entity_id is not None
             and entity_id != device.entity_id
         ):
-            if not self._is_valid_entity(entity_id):
+            if not self._supported_entity_domain(entity_id):
                 raise ValueError(f"Entity {entity_id} is not valid or not supported")
             if self._is_entity_already_linked(entity_id):
                 raise ValueError(f"Entity {entity_id} is already linked to another Hue device")
@@ -183,9 +234,13 @@ class HueDeviceManager:
         if name:
             device.update_name(name)
         if not isinstance(entity_id, _Sentinel):  # None = unlink, str = re-link
+            if device.entity_id:
+                self._entity_index.pop(device.entity_id, None)
             device.update_entity_link(entity_id)
+            if entity_id:
+                self._entity_index[entity_id] = device
 
-        await self._save_data()
+        self._schedule_save()
         
         _LOGGER.info("Updated Hue device: %s (ID: %s)", device.name, hue_id)
         return True
@@ -197,6 +252,18 @@ class HueDeviceManager:
     def get_all_devices(self) -> list[HueDevice]:
         """Get all active devices."""
         return list(self._devices.values())
+
+    def get_all_devices_sorted(self) -> tuple[HueDevice, ...]:
+        """Get all active devices ordered by numeric Hue ID.
+
+        The result is cached until a device is added or removed; updates
+        never change a device's Hue ID, so they keep the ordering valid.
+        """
+        if self._sorted_devices is None:
+            self._sorted_devices = tuple(
+                sorted(self._devices.values(), key=_hue_id_sort_key)
+            )
+        return self._sorted_devices
         
     def get_linked_devices(self) -> list[HueDevice]:
         """Get all devices linked to Home Assistant entities."""
@@ -204,42 +271,28 @@ class HueDeviceManager:
         
     def get_device_by_entity(self, entity_id: str) -> HueDevice | None:
         """Get device linked to a specific entity."""
-        for device in self._devices.values():
-            if device.entity_id == entity_id:
-                return device
-        return None
+        return self._entity_index.get(entity_id)
         
     def get_available_entities(self) -> list[str]:
         """Get list of available entities that can be linked."""
-        all_entities = []
-        
-        for domain in SUPPORTED_DOMAINS:
-            domain_entities = self.hass.states.async_entity_ids(domain)
-            all_entities.extend(domain_entities)
-            
-        # Filter out already linked entities
-        linked_entities = {device.entity_id for device in self._devices.values() if device.entity_id}
-        return [entity for entity in all_entities if entity not in linked_entities]
+        linked = self._entity_index
+        return [
+            entity_id
+            for entity_id in self.hass.states.async_entity_ids(SUPPORTED_DOMAINS)
+            if entity_id not in linked
+        ]
         
-    def _is_valid_entity(self, entity_id: str) -> bool:
-        """Check if entity exists and is supported."""
+    def _supported_entity_domain(self, entity_id: str) -> str | None:
+        """Return the entity's domain if it exists and is supported, else None."""
         state = self.hass.states.get(entity_id)
-        if not state:
-            return False
-            
-        domain = entity_id.split(".")[0]
-        return domain in SUPPORTED_DOMAINS
+        if not state or state.domain not in SUPPORTED_DOMAINS:
+            return None
+        return state.domain
         
     def _is_entity_already_linked(self, entity_id: str) -> bool:
         """Check if entity is already linked to another device."""
         return self.get_device_by_entity(entity_id) is not None
         
-    def _get_device_type(self, entity_id: str) -> str:
-        """Get device type based on entity domain."""
-        if not entity_id:
-            return "light"
-        return entity_id.split(".")[0]
-        
     def get_stats(self) -> dict[str, Any]:
         """Get manager statistics."""
         return {
@@ -19,6 +19,10 @@ _LOGGER = logging.getLogger(__name__)
 BROADCAST_PORT = 1900
 BROADCAST_ADDR = "239.255.255.250"
 
+# Kernel socket buffer size requested for the SSDP socket. The kernel clamps
+# this to net.core.rmem_max / wmem_max, so it is only a request.
+SSDP_SOCKET_BUFFER_SIZE = 4 * 1024 * 1024
+
 
 class DescriptionXmlView(HomeAssistantView):
     """Serve /description.xml — the UPnP device descriptor Alexa fetches after SSDP."""
@@ -153,6 +157,13 @@ async def async_create_upnp_datagram_endpoint(
 
     ssdp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
 
+    # Larger buffers so bursts of M-SEARCH packets are not dropped
+    for option in (socket.SO_RCVBUF, socket.SO_SNDBUF):
+        try:
+            ssdp_socket.setsockopt(socket.SOL_SOCKET, option, SSDP_SOCKET_BUFFER_SIZE)
+        except OSError as error:
+            _LOGGER.debug("Unable to set SSDP socket buffer size: %s", error)
+
     ssdp_socket.setsockopt(
         socket.SOL_IP, socket.IP_MULTICAST_IF, socket.inet_aton(host_ip_addr)
     )